@@ -12,12 +12,23 @@ Usage:
     python build.py maps         # Phase 3: Generate static choropleth maps
     python build.py issues       # Phase 5-6: Process issue/voting data
     python build.py timeline     # Phase 7: Process IfG historical data
+    python build.py dist         # Copy deployable files to dist/
+
+Add --force to a full build or `extract` to re-extract even when
+original-index.html and the extractor are unchanged.
+
+Add --link to a full build or `dist` to hard-link data/maps files into dist/
+instead of copying them (falls back to copying across filesystems). Only use
+it when dist/ is served in place, since the files share inodes with the
+sources.
 """
 
 import sys
 import os
+import errno
 import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
@@ -33,10 +44,11 @@ def ensure_dirs():
         os.makedirs(d, exist_ok=True)
 
 
-def phase_0_extract():
+def phase_0_extract(force=False):
     """Extract data from the original monolithic HTML file."""
     print("=== Phase 0: Extract data from original HTML ===")
-    os.system(f"cd {PROJECT_ROOT} && python3 scripts/extract_data.py")
+    from scripts import extract_data
+    extract_data.run(force=force)
 
 
 def phase_1a_ethnicity():
@@ -90,30 +102,77 @@ def phase_7_timeline():
     print("  Not yet implemented. See execution plan Phase 7.")
 
 
-def build_dist():
-    """Copy all deployable files to dist/."""
+def count_files(path):
+    """Count regular files under path, using directory entries only."""
+    n = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False):
+                n += 1
+            elif entry.is_dir(follow_symlinks=False):
+                n += count_files(entry.path)
+    return n
+
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst, copying instead where links aren't possible."""
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM):
+            raise
+        shutil.copy2(src, dst)
+
+
+def _replace_file(src, dst, copy_function):
+    # Remove any existing file first: os.link can't overwrite, and copying
+    # onto a previous hard link would write through to src
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    copy_function(src, dst)
+
+
+def copy_tree(src, dst, ignore=None, copy_function=shutil.copy2, max_workers=16):
+    """
+    Copy src into dst, replacing existing files in place.
+    Files are copied on a thread pool so their I/O overlaps; ignore and
+    copy_function take the same callables as shutil.copytree.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for root, dirs, files in os.walk(src):
+            ignored = ignore(root, dirs + files) if ignore else set()
+            dirs[:] = [d for d in dirs if d not in ignored]
+            target = os.path.join(dst, os.path.relpath(root, src))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                if name not in ignored:
+                    futures.append(pool.submit(_replace_file, os.path.join(root, name),
+                                               os.path.join(target, name), copy_function))
+        for future in futures:
+            future.result()
+
+
+def build_dist(link=False):
+    """Copy all deployable files to dist/ (hard-linked if link is set)."""
     print("=== Building dist/ ===")
     ensure_dirs()
+    copy_function = link_or_copy if link else shutil.copy2
     
     # Copy main HTML
     shutil.copy2(os.path.join(PROJECT_ROOT, "index.html"),
                  os.path.join(DIST_DIR, "index.html"))
     
     # Copy data files
-    dist_data = os.path.join(DIST_DIR, "data")
-    if os.path.exists(dist_data):
-        shutil.rmtree(dist_data)
-    shutil.copytree(DATA_DIR, dist_data,
-                    ignore=shutil.ignore_patterns("sources", "_debug_*"))
+    copy_tree(DATA_DIR, os.path.join(DIST_DIR, "data"),
+              ignore=shutil.ignore_patterns("sources", "_debug_*", ".extract_stamp"),
+              copy_function=copy_function)
     
     # Copy maps if they exist
-    dist_maps = os.path.join(DIST_DIR, "maps")
     if os.path.exists(MAPS_DIR) and os.listdir(MAPS_DIR):
-        if os.path.exists(dist_maps):
-            shutil.rmtree(dist_maps)
-        shutil.copytree(MAPS_DIR, dist_maps)
+        copy_tree(MAPS_DIR, os.path.join(DIST_DIR, "maps"), copy_function=copy_function)
     
-    print(f"  dist/ built with {sum(len(f) for _, _, f in os.walk(DIST_DIR))} files")
+    print(f"  dist/ built with {count_files(DIST_DIR)} files")
 
 
 COMMANDS = {
@@ -130,9 +189,18 @@ COMMANDS = {
 def main():
     ensure_dirs()
     
-    if len(sys.argv) > 1:
-        cmd = sys.argv[1]
-        if cmd in COMMANDS:
+    args = sys.argv[1:]
+    link = "--link" in args
+    force = "--force" in args
+    args = [a for a in args if a not in ("--link", "--force")]
+    
+    if args:
+        cmd = args[0]
+        if cmd == "extract":
+            phase_0_extract(force=force)
+        elif cmd == "dist":
+            build_dist(link=link)
+        elif cmd in COMMANDS:
             COMMANDS[cmd]()
         else:
             print(f"Unknown command: {cmd}")
@@ -140,13 +208,13 @@ def main():
             sys.exit(1)
     else:
         # Full build
-        phase_0_extract()
+        phase_0_extract(force=force)
         phase_1a_ethnicity()
         phase_1b_demographics()
         phase_3_maps()
         phase_5_issues()
         phase_7_timeline()
-        build_dist()
+        build_dist(link=link)
     
     print("\nDone.")
 
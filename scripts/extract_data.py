@@ -4,71 +4,95 @@ Phase 0: Extract embedded JavaScript data from the original index.html
 into separate JSON files for the refactored multi-file architecture.
 """
 
+import hashlib
 import json
+import mmap
 import re
 import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(PROJECT_ROOT, "original-index.html")
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+
+# Hash of the SRC (and of this script) that produced the current outputs;
+# a rerun with neither changed is skipped
+STAMP_PATH = os.path.join(DATA_DIR, ".extract_stamp")
+OUTPUT_FILES = [
+    "departments.json", "cross-cutting.json", "lords-whips.json", "changelog.json",
+    "wealth-estimates.json", "mp-info.json", "dept-budgets.json",
+    "wealth-percentile-thresholds.json",
+]
 
-SRC = "original-index.html"
-DATA_DIR = "data"
+# --- Strategy: use a JS-like parser approach ---
+# Since the data is valid JS object literals, we can convert them to JSON
+# by extracting each var block and doing careful regex transforms
 
-with open(SRC, "r", encoding="utf-8") as f:
-    html = f.read()
+# The HTML is searched as raw bytes (see run()); only the extracted literals
+# are decoded to str.
 
-# Extract the <script> block
-script_match = re.search(r"<script>\s*// DATA\s*(.*?)\s*// WEALTH PERCENTILE", html, re.DOTALL)
-if not script_match:
-    raise ValueError("Could not find DATA section in HTML")
+# One bracket per match: everything before it (plain characters and whole
+# single/double-quoted strings, with escapes) is consumed inside the regex
+# engine, so brackets inside strings are never seen and Python only
+# iterates once per bracket
+_BRACKET_RE = re.compile(
+    rb'(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^"\'\[\]{}])*([\[\]{}])', re.DOTALL)
 
-data_section = script_match.group(1)
+# Unquoted keys (word characters before colon) | trailing commas before } or ].
+# The two alternatives can never match at the same position, so a single
+# pass gives the same result as running them one after the other. The
+# whitespace before a key or closing bracket is kept, so the converted text
+# keeps the literal's layout.
+_KEY_OR_TRAILING_COMMA_RE = re.compile(r'(?<=[{,\n])(\s*)(\w+)\s*:|,(\s*[}\]])')
 
-# We also need WEALTH_EST and MP_INFO which are after DATA section
-full_script = re.search(r"<script>(.*?)</script>", html, re.DOTALL).group(1)
 
-# --- Strategy: use a JS-like parser approach ---
-# Since the data is valid JS object literals, we can convert them to JSON
-# by extracting each var block and doing careful regex transforms
+def _quote_key_or_drop_comma(m):
+    key = m.group(2)
+    return f'{m.group(1)}"{key}":' if key is not None else m.group(3)
+
 
 def js_var_to_json(varname, source):
-    """Extract a JS var assignment and convert to JSON-compatible string."""
+    """
+    Extract a JS var assignment from bytes-like source (bytes, mmap or
+    memoryview) and return the literal as a str.
+    """
     # Match: var VARNAME = [...]; or var VARNAME = {...};
-    pattern = rf'var\s+{varname}\s*=\s*'
+    pattern = rb'var\s+' + re.escape(varname.encode()) + rb'\s*=\s*'
     match = re.search(pattern, source)
     if not match:
         raise ValueError(f"Could not find var {varname}")
     
     start = match.end()
-    
-    # Find the matching closing bracket/brace
-    depth = 0
-    i = start
-    opener = source[i]
-    if opener == '[':
-        close = ']'
-    elif opener == '{':
-        close = '}'
+    end = find_literal_end(source, start, varname)
+    raw = bytes(source[start:end]).decode("utf-8")
+    return raw
+
+
+def find_literal_end(source, start, varname="literal"):
+    """Return the index just past the [ or { literal opening at source[start]."""
+    opener = bytes(source[start:start+1])
+    if opener == b'[':
+        close = b']'
+    elif opener == b'{':
+        close = b'}'
     else:
-        raise ValueError(f"Expected [ or {{ after var {varname}, got {opener}")
+        raise ValueError(f"Expected [ or {{ after var {varname}, got {opener.decode(errors='replace')}")
     
-    while i < len(source):
-        ch = source[i]
+    depth = 0
+    for tok in _BRACKET_RE.finditer(source, start):
+        ch = tok.group(1)
         if ch == opener:
             depth += 1
         elif ch == close:
             depth -= 1
             if depth == 0:
-                break
-        elif ch in ('"', "'"):
-            # Skip string content
-            quote = ch
-            i += 1
-            while i < len(source) and source[i] != quote:
-                if source[i] == '\\':
-                    i += 1  # skip escaped char
-                i += 1
-        i += 1
-    
-    raw = source[start:i+1]
-    return raw
+                return tok.end()
+    raise ValueError(f"Unterminated literal for var {varname}")
 
 
 def js_to_json(raw):
@@ -77,11 +101,8 @@ def js_to_json(raw):
     # Replace single-quoted strings (careful not to break apostrophes inside doubles)
     # For our data, keys are unquoted identifiers — we need to quote them
     
-    # Quote unquoted keys: word characters before colon
-    s = re.sub(r'(?<=[{,\n])\s*(\w+)\s*:', r'"\1":', s)
-    
-    # Handle trailing commas before } or ]
-    s = re.sub(r',\s*([}\]])', r'\1', s)
+    # Quote unquoted keys and drop trailing commas before } or ], in one pass
+    s = _KEY_OR_TRAILING_COMMA_RE.sub(_quote_key_or_drop_comma, s)
     
     # Replace JS true/false/null (already JSON compatible, but just in case)
     # Handle unicode escapes — these are already valid JSON
@@ -92,14 +113,29 @@ def js_to_json(raw):
     return s
 
 
-def extract_and_save(varname, filename, source):
-    """Extract a JS variable and save as JSON."""
+def write_json(path, data):
+    """Write data as 2-space indented UTF-8 JSON (orjson when installed)."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def extract_and_save(varname, filename, source, validate_only=False):
+    """
+    Extract a JS variable and save as JSON.
+    With validate_only, True is returned instead of the data; use it for
+    variables nothing else in this script needs.
+    Returns None if the conversion fails.
+    """
     raw = js_var_to_json(varname, source)
     json_str = js_to_json(raw)
     
     try:
-        data = json.loads(json_str)
-    except json.JSONDecodeError as e:
+        data = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
+    except ValueError as e:
         # Save the raw conversion for debugging
         debug_path = os.path.join(DATA_DIR, f"_debug_{filename}")
         with open(debug_path, "w") as f:
@@ -108,9 +144,7 @@ def extract_and_save(varname, filename, source):
         print(f"  Raw saved to {debug_path} for debugging")
         return None
     
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    write_json(os.path.join(DATA_DIR, filename), data)
     
     # Print stats
     if isinstance(data, list):
@@ -118,53 +152,103 @@ def extract_and_save(varname, filename, source):
     elif isinstance(data, dict):
         print(f"  {varname} -> {filename}: {len(data)} keys")
     
-    return data
-
-
-print("Extracting data from original index.html...")
-print()
-
-departments = extract_and_save("DEPARTMENTS", "departments.json", full_script)
-cross_cutting = extract_and_save("CROSS_CUTTING", "cross-cutting.json", full_script)
-lords_whips = extract_and_save("LORDS_WHIPS", "lords-whips.json", full_script)
-changelog = extract_and_save("CHANGELOG", "changelog.json", full_script)
-wealth_est = extract_and_save("WEALTH_EST", "wealth-estimates.json", full_script)
-mp_info = extract_and_save("MP_INFO", "mp-info.json", full_script)
-dept_budget = extract_and_save("DEPT_BUDGET", "dept-budgets.json", full_script)
-
-# Also extract the wealth percentile thresholds
-wpt_match = re.search(r'var\s+WPT\s*=\s*(\[.*?\]);', full_script)
-if wpt_match:
-    wpt_data = json.loads(wpt_match.group(1))
-    with open(os.path.join(DATA_DIR, "wealth-percentile-thresholds.json"), "w") as f:
-        json.dump(wpt_data, f, indent=2)
-    print(f"  WPT -> wealth-percentile-thresholds.json: {len(wpt_data)} thresholds")
-
-print()
-print("Done. Files saved to data/")
-print()
-
-# Verify key relationships
-if mp_info and departments:
-    all_ministers = set()
-    for dept in departments:
-        all_ministers.add(dept["secretary"]["name"])
-        for m in dept.get("mos", []):
-            all_ministers.add(m["name"])
-        for m in dept.get("puss", []):
-            all_ministers.add(m["name"])
-    
-    mp_names = set(mp_info.keys()) if mp_info else set()
-    
-    missing_from_mp_info = all_ministers - mp_names
-    if missing_from_mp_info:
-        print(f"WARNING: {len(missing_from_mp_info)} ministers not in MP_INFO:")
-        for n in sorted(missing_from_mp_info):
-            print(f"  - {n}")
-    
-    extra_in_mp_info = mp_names - all_ministers
-    # These are expected (cross-cutting, whips, etc.)
-    
-    ministers_with_parlid = sum(1 for v in mp_info.values() if v.get("parlId"))
-    print(f"Ministers with parlId: {ministers_with_parlid}/{len(mp_info)}")
-    print(f"Total unique ministers in departments: {len(all_ministers)}")
+    return True if validate_only else data
+
+
+def _read_stamp():
+    try:
+        with open(STAMP_PATH) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def run(force=False):
+    """
+    Extract every data variable from SRC into DATA_DIR.
+    Skipped when the content hash of SRC and of this script matches the last
+    successful run and all outputs exist, unless force is set.
+    """
+    if not os.path.exists(SRC):
+        print(f"  {os.path.basename(SRC)} not found, skipping extraction")
+        return
+
+    # Map the file and search the raw bytes: nothing is decoded except the
+    # literals that are actually extracted
+    with open(SRC, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as html:
+        h = hashlib.blake2b(html)
+        # Changes to the extraction code must invalidate the stamp too
+        with open(__file__, "rb") as script_file:
+            h.update(script_file.read())
+        digest = h.hexdigest()
+        if (not force and digest == _read_stamp()
+                and all(os.path.exists(os.path.join(DATA_DIR, n)) for n in OUTPUT_FILES)):
+            print("original-index.html and extractor unchanged since last extraction, skipping")
+            return
+
+        # Extract the <script> block
+        script_match = re.search(rb"<script>\s*// DATA\s*(.*?)\s*// WEALTH PERCENTILE", html, re.DOTALL)
+        if not script_match:
+            raise ValueError("Could not find DATA section in HTML")
+
+        # We also need WEALTH_EST and MP_INFO which are after DATA section
+        script = re.search(rb"<script>(.*?)</script>", html, re.DOTALL)
+
+        print("Extracting data from original index.html...")
+        print()
+
+        # Zero-copy view of the script body; released before the map closes
+        with memoryview(html)[script.start(1):script.end(1)] as full_script:
+            # Only DEPARTMENTS and MP_INFO are needed for the checks below
+            departments = extract_and_save("DEPARTMENTS", "departments.json", full_script)
+            saved = [
+                extract_and_save("CROSS_CUTTING", "cross-cutting.json", full_script, validate_only=True),
+                extract_and_save("LORDS_WHIPS", "lords-whips.json", full_script, validate_only=True),
+                extract_and_save("CHANGELOG", "changelog.json", full_script, validate_only=True),
+                extract_and_save("WEALTH_EST", "wealth-estimates.json", full_script, validate_only=True),
+            ]
+            mp_info = extract_and_save("MP_INFO", "mp-info.json", full_script)
+            saved.append(extract_and_save("DEPT_BUDGET", "dept-budgets.json", full_script, validate_only=True))
+
+            # Also extract the wealth percentile thresholds
+            wpt_match = re.search(rb'var\s+WPT\s*=\s*(\[.*?\]);', full_script)
+            if wpt_match:
+                wpt_data = json.loads(wpt_match.group(1))
+                write_json(os.path.join(DATA_DIR, "wealth-percentile-thresholds.json"), wpt_data)
+                print(f"  WPT -> wealth-percentile-thresholds.json: {len(wpt_data)} thresholds")
+
+    # Only stamp a fully successful run, so failures are retried next time
+    if departments is not None and mp_info is not None and all(saved) and wpt_match:
+        with open(STAMP_PATH, "w") as f:
+            f.write(digest + "\n")
+
+    print()
+    print("Done. Files saved to data/")
+    print()
+
+    # Verify key relationships
+    if mp_info and departments:
+        all_ministers = set()
+        for dept in departments:
+            all_ministers.add(dept["secretary"]["name"])
+            all_ministers.update(m["name"] for m in dept.get("mos", ()))
+            all_ministers.update(m["name"] for m in dept.get("puss", ()))
+
+        mp_names = mp_info.keys()
+
+        missing_from_mp_info = all_ministers - mp_names
+        if missing_from_mp_info:
+            print(f"WARNING: {len(missing_from_mp_info)} ministers not in MP_INFO:")
+            for n in sorted(missing_from_mp_info):
+                print(f"  - {n}")
+
+        extra_in_mp_info = mp_names - all_ministers
+        # These are expected (cross-cutting, whips, etc.)
+
+        ministers_with_parlid = sum(1 for v in mp_info.values() if v.get("parlId"))
+        print(f"Ministers with parlId: {ministers_with_parlid}/{len(mp_info)}")
+        print(f"Total unique ministers in departments: {len(all_ministers)}")
+
+
+if __name__ == "__main__":
+    run(force="--force" in sys.argv[1:])
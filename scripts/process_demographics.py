@@ -19,22 +19,92 @@ Both modes output: data/constituency-demographics.json
 
 import json
 import os
+import re
 import sys
 import argparse
+import functools
 from difflib import SequenceMatcher
 
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+except ImportError:
+    fuzz_process = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 
+# Smart quotes -> ASCII, for matching MP_INFO names against census names
+_SMART_QUOTES = str.maketrans({"\u2019": "'", "\u2018": "'", "\u201c": '"', "\u201d": '"'})
+
+
+def normalize_name(s):
+    """Normalize smart quotes so constituency names compare equal."""
+    return s.translate(_SMART_QUOTES)
+
+
+@functools.lru_cache(maxsize=None)
+def load_mp_constituencies(mp_info_path):
+    """
+    Load MP_INFO once and return (minister, constituency, normalized constituency)
+    tuples for every entry that has a constituency.
+    """
+    with open(mp_info_path) as f:
+        mp_info = json.load(f)
+    return tuple((name, info["con"], normalize_name(info["con"]))
+                 for name, info in mp_info.items() if info.get("con"))
+
+
+_MATCH_CHARS = str.maketrans({"&": " and "})
+_WORD_RE = re.compile(r"\w+")
 
-def fuzzy_match(name, candidates, threshold=0.80):
-    """Find the best fuzzy match for a constituency name."""
+
+def normalize_for_match(name):
+    """
+    Normalize a constituency name for fuzzy comparison: lowercase, "&" -> "and",
+    punctuation dropped and words sorted, so "St. Pancras" matches "St Pancras"
+    and "East Renfrewshire" matches "Renfrewshire East".
+    """
+    return " ".join(sorted(_WORD_RE.findall(name.lower().translate(_MATCH_CHARS))))
+
+
+def fuzzy_match(name, candidates, threshold=0.80, normalized=None):
+    """
+    Find the best fuzzy match for a constituency name.
+    Pass `normalized` (candidates run through normalize_for_match, same order)
+    to avoid re-normalizing the candidate list on every call.
+
+    With rapidfuzz, candidates are ranked by token-set score with ties broken
+    on token-sort score (plain ratio of the sorted-word keys); both must clear
+    the threshold and the token-sort score is returned, since token-set alone
+    scores any word subset ("Leeds" in "Leeds West and Pudsey") as a perfect
+    match.
+    """
+    candidates = list(candidates)
+    if normalized is None:
+        normalized = [normalize_for_match(c) for c in candidates]
+    name_norm = normalize_for_match(name)
+
+    if fuzz_process is not None:
+        cutoff = threshold * 100
+        best = None
+        for _, set_score, idx in fuzz_process.extract(name_norm, normalized, scorer=fuzz.token_set_ratio,
+                                                      score_cutoff=cutoff, limit=None):
+            sort_score = fuzz.ratio(name_norm, normalized[idx], score_cutoff=cutoff)
+            if sort_score and (best is None or (set_score, sort_score) > best[:2]):
+                best = (set_score, sort_score, idx)
+        if best is None:
+            return None, 0
+        return candidates[best[2]], best[1] / 100
+
+    # Fallback: pure-Python difflib when rapidfuzz isn't installed
     best_score = 0
     best_match = None
-    # Normalize for comparison
-    name_norm = name.lower().replace("&", "and").replace(",", "").strip()
-    for c in candidates:
-        c_norm = c.lower().replace("&", "and").replace(",", "").strip()
+    for c, c_norm in zip(candidates, normalized):
         score = SequenceMatcher(None, name_norm, c_norm).ratio()
         if score > best_score:
             best_score = score
@@ -44,6 +114,62 @@ def fuzzy_match(name, candidates, threshold=0.80):
     return None, best_score
 
 
+def fuzzy_match_all(names, candidates, threshold=0.80):
+    """
+    Fuzzy-match many constituency names against the same candidates.
+    Returns {name: (match, score)} for names scoring at or above threshold,
+    ranked and scored as in fuzzy_match; the batched path must pick the same
+    candidate even when scores are fractional:
+
+    >>> name = "cgbhec ddhdacdge eedae efgg"
+    >>> cands = ["cgbh ec ddhdacdge eedae  efgg", "cgbhec dddacdge eedae efgg"]
+    >>> fuzzy_match_all([name], cands)[name] == fuzzy_match(name, cands)
+    True
+    """
+    candidates = list(candidates)
+    normalized = [normalize_for_match(c) for c in candidates]
+    names = list(names)
+    if not names or not candidates:
+        return {}
+
+    # rapidfuzz's cdist returns numpy arrays, but rapidfuzz doesn't install
+    # numpy; imported here so runs with nothing to match don't pay for it
+    numpy = None
+    if fuzz_process is not None:
+        try:
+            import numpy
+        except ImportError:
+            pass
+
+    if numpy is None:
+        matches = {}
+        for name in names:
+            match, score = fuzzy_match(name, candidates, threshold, normalized)
+            if match:
+                matches[name] = (match, score)
+        return matches
+
+    # Score the whole names x candidates matrix in one call per scorer
+    queries = [normalize_for_match(n) for n in names]
+    set_scores = fuzz_process.cdist(queries, normalized, scorer=fuzz.token_set_ratio,
+                                    workers=-1, dtype=numpy.float64)
+    sort_scores = fuzz_process.cdist(queries, normalized, scorer=fuzz.ratio,
+                                     workers=-1, dtype=numpy.float64)
+    
+    # Rank by token-set score, ties broken on token-sort; both must clear the
+    # cutoff. Scores are fractional, so restrict each row to its top eligible
+    # token-set score first, then take the best token-sort score among those.
+    cutoff = threshold * 100
+    eligible = (set_scores >= cutoff) & (sort_scores >= cutoff)
+    top = numpy.where(eligible, set_scores, -1).max(axis=1, keepdims=True)
+    best = numpy.where(eligible & (set_scores == top), sort_scores, -1).argmax(axis=1)
+    matches = {}
+    for i, (name, idx) in enumerate(zip(names, best)):
+        if eligible[i, idx]:
+            matches[name] = (candidates[idx], float(sort_scores[i, idx]) / 100)
+    return matches
+
+
 def process_excel(excel_path):
     """
     Process the Commons Library ethnicity Excel file.
@@ -52,6 +178,18 @@ def process_excel(excel_path):
     - GSS code (PCON24CD)
     - Ethnic group percentages (White, Asian, Black, Mixed, Other)
     """
+    print(f"Reading Excel file: {excel_path}")
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        CalamineWorkbook = None
+
+    if CalamineWorkbook is not None:
+        # calamine parses the xlsx in Rust and hands back plain Python rows
+        wb = CalamineWorkbook.from_path(excel_path)
+        target_sheet = _find_ethnicity_sheet(wb.sheet_names)
+        return _read_ethnicity_rows(iter(wb.get_sheet_by_name(target_sheet).to_python()))
+
     try:
         import openpyxl
     except ImportError:
@@ -59,11 +197,17 @@ def process_excel(excel_path):
         os.system("pip install openpyxl --break-system-packages -q")
         import openpyxl
 
-    print(f"Reading Excel file: {excel_path}")
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
-    
-    # Try to find the right sheet
-    sheet_names = wb.sheetnames
+    # read_only streams rows from the XML instead of building the cell graph
+    wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
+    try:
+        target_sheet = _find_ethnicity_sheet(wb.sheetnames)
+        return _read_ethnicity_rows(wb[target_sheet].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def _find_ethnicity_sheet(sheet_names):
+    """Pick the workbook sheet holding constituency-level ethnicity data."""
     print(f"  Sheets found: {sheet_names}")
     
     # Look for a sheet with constituency-level ethnicity data
@@ -76,18 +220,24 @@ def process_excel(excel_path):
     if not target_sheet:
         target_sheet = sheet_names[0]
     
-    ws = wb[target_sheet]
     print(f"  Using sheet: {target_sheet}")
-    
+    return target_sheet
+
+
+def _read_ethnicity_rows(rows):
+    """
+    Read constituencies from an iterator of row tuples, header row first.
+    Empty cells may be None (openpyxl) or "" (calamine).
+    """
     # Read headers
-    headers = [cell.value for cell in ws[1]]
+    headers = list(next(rows, ()))
     print(f"  Headers: {headers[:10]}...")
     
     # Find relevant columns - adapt these based on actual headers
     # Common patterns: "Constituency", "PCON24NM", "White (%)", "Asian (%)", etc.
     col_map = {}
     for i, h in enumerate(headers):
-        if h is None:
+        if h is None or h == "":
             continue
         hl = str(h).lower().strip()
         if any(k in hl for k in ["constituency", "pcon24nm", "pcon name"]):
@@ -113,10 +263,26 @@ def process_excel(excel_path):
         print("  Available headers:", headers)
         return None
     
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
     # Read data
+    if pd is not None:
+        constituencies = _ethnicity_records_pandas(pd, rows, col_map, len(headers))
+        print(f"  Loaded {len(constituencies)} constituencies from Excel")
+        return constituencies
+
+    # Resolve column indices once rather than per row (None = column absent)
+    name_col = col_map["name"]
+    gss_col = col_map.get("gss_code")
+    pct_cols = [(field, col_map.get(field))
+                for field in ["white_pct", "asian_pct", "black_pct", "mixed_pct", "other_pct"]]
+    
     constituencies = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        name = row[col_map["name"]]
+    for row in rows:
+        name = row[name_col]
         if not name or str(name).strip() == "":
             continue
         
@@ -124,13 +290,13 @@ def process_excel(excel_path):
             "constituency_name": str(name).strip(),
         }
         
-        if "gss_code" in col_map and row[col_map["gss_code"]]:
-            entry["gss_code"] = str(row[col_map["gss_code"]]).strip()
+        if gss_col is not None and row[gss_col]:
+            entry["gss_code"] = str(row[gss_col]).strip()
         
-        for field in ["white_pct", "asian_pct", "black_pct", "mixed_pct", "other_pct"]:
-            if field in col_map:
-                val = row[col_map[field]]
-                if val is not None:
+        for field, col in pct_cols:
+            if col is not None:
+                val = row[col]
+                if val is not None and val != "":
                     try:
                         entry[field] = round(float(val), 1)
                     except (ValueError, TypeError):
@@ -152,6 +318,43 @@ def process_excel(excel_path):
     return constituencies
 
 
+def _ethnicity_records_pandas(pd, rows, col_map, width):
+    """
+    Column-wise version of the row loop in _read_ethnicity_rows.
+    Coercion runs over whole columns; missing or unparseable values come
+    back as None, as in the row loop. Rounding goes through Python's
+    round() (Series.round differs on ties such as 12.35), so both paths
+    produce identical values.
+    """
+    def round_1dp(series):
+        return series.map(lambda v: round(v, 1))
+    
+    df = pd.DataFrame(list(rows)).reindex(columns=range(width))
+    
+    names = df[col_map["name"]].astype("string").str.strip()
+    keep = (names.notna() & (names != "")).to_numpy(dtype=bool)
+    df = df[keep]
+    
+    out = pd.DataFrame({"constituency_name": names[keep]})
+    if "gss_code" in col_map:
+        gss = df[col_map["gss_code"]].astype("string").str.strip()
+        out["gss_code"] = gss.where(gss != "")
+    
+    for field in ["white_pct", "asian_pct", "black_pct", "mixed_pct", "other_pct"]:
+        if field in col_map:
+            out[field] = round_1dp(pd.to_numeric(df[col_map[field]], errors="coerce"))
+        else:
+            out[field] = float("nan")
+    
+    # Non-white percentage: 100 - White, else the sum of the other groups
+    # (added in the same order as the row loop; NaN if any is missing)
+    others = out["asian_pct"] + out["black_pct"] + out["mixed_pct"] + out["other_pct"]
+    out["nonwhite_pct"] = round_1dp(100 - out["white_pct"]).fillna(round_1dp(others))
+    
+    out = out.astype(object).where(out.notna(), None)
+    return out.to_dict(orient="records")
+
+
 def load_manual_data():
     """
     Load manually compiled constituency demographics for ministerial constituencies.
@@ -277,13 +480,7 @@ def load_manual_data():
 
 def validate_against_mp_info(constituencies, mp_info_path):
     """Cross-reference with MP_INFO to check name matching."""
-    with open(mp_info_path) as f:
-        mp_info = json.load(f)
-    
-    mp_constituencies = set()
-    for name, info in mp_info.items():
-        if info.get("con"):
-            mp_constituencies.add(info["con"])
+    mp_constituencies = {con for _, con, _ in load_mp_constituencies(mp_info_path)}
     
     demo_names = set(c["constituency_name"] for c in constituencies)
     
@@ -292,11 +489,7 @@ def validate_against_mp_info(constituencies, mp_info_path):
     unmatched = mp_constituencies - demo_names
     
     # Try fuzzy matching for unmatched
-    fuzzy_matches = {}
-    for u in unmatched:
-        match, score = fuzzy_match(u, demo_names)
-        if match:
-            fuzzy_matches[u] = (match, score)
+    fuzzy_matches = fuzzy_match_all(sorted(unmatched), sorted(demo_names))
     
     print(f"\n=== Validation against MP_INFO ===")
     print(f"  Minister constituencies: {len(mp_constituencies)}")
@@ -320,24 +513,10 @@ def validate_against_mp_info(constituencies, mp_info_path):
 
 def build_output(constituencies, mp_info_path):
     """Build the final JSON output with MP linkage."""
-    with open(mp_info_path) as f:
-        mp_info = json.load(f)
-    
-    # Build reverse lookup: constituency -> minister names
-    # Normalize smart quotes for matching
-    def normalize_name(s):
-        return s.replace("\u2019", "'").replace("\u2018", "'").replace("\u201c", '"').replace("\u201d", '"')
-    
+    # Build reverse lookup: normalized constituency -> minister names
     con_to_ministers = {}
-    con_name_map = {}  # normalized -> original
-    for name, info in mp_info.items():
-        con = info.get("con")
-        if con:
-            norm = normalize_name(con)
-            if norm not in con_to_ministers:
-                con_to_ministers[norm] = []
-            con_to_ministers[norm].append(name)
-            con_name_map[norm] = con
+    for name, _, norm in load_mp_constituencies(mp_info_path):
+        con_to_ministers.setdefault(norm, []).append(name)
     
     output = {
         "_metadata": {
@@ -392,6 +571,18 @@ def build_output(constituencies, mp_info_path):
     return output
 
 
+# Same helper as in extract_data.py; the scripts are run standalone and
+# don't import each other
+def write_json(path, data):
+    """Save data as indented JSON."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Process constituency demographics")
     parser.add_argument("--excel", help="Path to Commons Library ethnicity Excel file")
@@ -424,8 +615,7 @@ def main():
     
     # Save
     out_path = os.path.join(DATA_DIR, "constituency-demographics.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    write_json(out_path, output)
     
     print(f"\nSaved to {out_path}")
     print(f"  {len(output['constituencies'])} constituencies")